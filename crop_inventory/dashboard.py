@@ -8,22 +8,193 @@ import pandas as pd
 import numpy as np
 import json
 import os
+import hashlib
+import math
+import re
+from functools import lru_cache
 
 
-def create_dashboard(inventory_json_path, summary_csv_path, country_mapping_file=None, country_summary_path=None):
+# Columns shown in the inventory details table and rows per page
+TABLE_COLUMNS = ['country_name', 'crop', 'year_range', 'seasonality', 'indicators_available']
+TABLE_PAGE_SIZE = 15
+
+# Bump when load_summary_data changes its output, to invalidate cached snapshots
+SUMMARY_CACHE_VERSION = 1
+
+# Largest year heatmap rendered before rows/columns are aggregated
+MAX_HEATMAP_ROWS = 50
+MAX_HEATMAP_COLS = 120
+
+# DataTable filter_query operators, as (query keyword, symbolic alias)
+FILTER_OPERATORS = [
+    ['ge ', '>='],
+    ['le ', '<='],
+    ['lt ', '<'],
+    ['gt ', '>'],
+    ['ne ', '!='],
+    ['eq ', '='],
+    ['contains '],
+    ['datestartswith ']
+]
+
+# One filter_query clause: {column}, an operator with an optional case prefix
+# (i = insensitive, s = sensitive), and the value
+FILTER_CLAUSE_RE = re.compile(
+    r"^\s*\{(?P<name>[^}]*)\}\s*(?P<case>[is]?)(?P<operator>"
+    + "|".join(
+        re.escape(operator.strip()) + (r"(?=\s|$)" if operator.endswith(' ') else '')
+        for operator_type in FILTER_OPERATORS for operator in operator_type
+    )
+    + r")\s*(?P<value>.*?)\s*$",
+    re.IGNORECASE
+)
+
+# Leading number of a text cell, e.g. the first year of a year range
+LEADING_NUMBER_RE = r"^\s*(-?\d+(?:\.\d+)?)"
+
+
+def split_filter_part(filter_part):
     """
-    Create a Dash application to visualize the crop inventory.
+    Split one clause of a DataTable filter_query into
+    (column, operator, value, case_insensitive).
     """
-    # Check if files exist
-    for path in [inventory_json_path, summary_csv_path]:
-        if not os.path.exists(path):
-            raise FileNotFoundError(f"File not found: {path}")
+    match = FILTER_CLAUSE_RE.match(filter_part)
+    if not match:
+        return None, None, None, False
+    
+    operator = match.group('operator').lower()
+    for operator_type in FILTER_OPERATORS:
+        if operator in (alias.strip() for alias in operator_type):
+            operator = operator_type[0].strip()
+            break
+    
+    # Strip quotes around the value (all table columns are text)
+    value = match.group('value')
+    if len(value) > 1 and value[0] == value[-1] and value[0] in ("'", '"', '`'):
+        value = value[1:-1].replace('\\' + value[0], value[0])
+    
+    return match.group('name'), operator, value, match.group('case').lower() == 'i'
+
+
+def query_table(table_df, sort_by=None, filter_query=None):
+    """
+    Apply the DataTable's custom filtering and sorting to the table rows.
+    """
+    if filter_query:
+        for filter_part in filter_query.split(' && '):
+            col_name, operator, filter_value, case_insensitive = split_filter_part(filter_part)
+            if col_name not in table_df.columns:
+                continue
+            
+            column = table_df[col_name].astype(str)
+            if operator in ('lt', 'le', 'gt', 'ge'):
+                # The table columns are text, so compare by their leading numbers;
+                # cells (or values) without one never match
+                numbers = pd.to_numeric(column.str.extract(LEADING_NUMBER_RE, expand=False), errors='coerce')
+                value_match = re.match(LEADING_NUMBER_RE, filter_value)
+                value = float(value_match.group(1)) if value_match else np.nan
+                table_df = table_df[getattr(numbers, operator)(value).to_numpy()]
+                continue
+            
+            if case_insensitive:
+                column = column.str.lower()
+                filter_value = filter_value.lower()
+            if operator == 'contains':
+                table_df = table_df[column.str.contains(filter_value, regex=False).to_numpy()]
+            elif operator == 'datestartswith':
+                table_df = table_df[column.str.startswith(filter_value).to_numpy()]
+            elif operator in ('eq', 'ne'):
+                table_df = table_df[getattr(column, operator)(filter_value).to_numpy()]
+    
+    if sort_by:
+        table_df = table_df.sort_values(
+            [col['column_id'] for col in sort_by],
+            ascending=[col['direction'] == 'asc' for col in sort_by]
+        )
+    
+    return table_df
+
+
+def bound_heatmap(heatmap_df, max_rows=MAX_HEATMAP_ROWS, max_cols=MAX_HEATMAP_COLS):
+    """
+    Keep a binary presence heatmap within a renderable size: bin adjacent year
+    columns together and collapse the least-covered rows into an "Other" row.
+    """
+    if heatmap_df.shape[1] > max_cols:
+        bin_size = math.ceil(heatmap_df.shape[1] / max_cols)
+        bins = np.arange(heatmap_df.shape[1]) // bin_size
+        years = heatmap_df.columns
+        labels = [
+            f"{years[bins == b][0]}-{years[bins == b][-1]}" if (bins == b).sum() > 1 else str(years[bins == b][0])
+            for b in np.unique(bins)
+        ]
+        heatmap_df = heatmap_df.T.groupby(bins).max().T
+        heatmap_df.columns = labels
+    
+    if heatmap_df.shape[0] > max_rows:
+        coverage = heatmap_df.sum(axis=1).to_numpy()
+        keep = np.zeros(len(heatmap_df), dtype=bool)
+        keep[np.argsort(-coverage, kind='stable')[:max_rows]] = True
+        other = heatmap_df[~keep].max(axis=0).rename('Other')
+        heatmap_df = pd.concat([heatmap_df[keep], other.to_frame().T])
+    
+    return heatmap_df
+
+
+def map_figure(map_agg=None):
+    """
+    Choropleth of the number of crops per country from a stored map aggregation.
+    
+    The figure always carries one choropleth trace, so filter changes can be sent
+    as a Patch of the trace data instead of a whole new figure.
+    """
+    map_agg = map_agg or {'map_code': [], 'country_name': [], 'crop': []}
+    
+    # Create choropleth map - Using ISO3 codes for better map visualization
+    map_fig = go.Figure(go.Choropleth(
+        locations=map_agg['map_code'],
+        z=map_agg['crop'],
+        text=map_agg['country_name'],
+        locationmode='ISO-3',  # Explicitly use ISO-3 codes for mapping
+        colorscale='Viridis',
+        colorbar=dict(title=dict(text='Number of Crops')),
+        hovertemplate='<b>%{text}</b><br>Number of Crops: %{z}<extra></extra>'
+    ))
     
+    # Improve map layout; a constant uirevision keeps zoom/pan across updates
+    map_fig.update_layout(
+        title=map_title(map_agg),
+        geo=dict(
+            showframe=False,
+            showcoastlines=True,
+            projection_type='equirectangular'
+        ),
+        margin={"r":0,"t":40,"l":0,"b":0},
+        uirevision='map-ui'
+    )
+    
+    return map_fig
+
+
+def map_title(map_agg):
+    """
+    Title of the coverage map for a stored map aggregation.
+    """
+    if map_agg and map_agg['map_code']:
+        return "Crop Data Coverage by Country"
+    return "No data available for the selected filters"
+
+
+def load_summary_data(inventory_json_path, summary_csv_path, country_code_path, country_summary_path=None):
+    """
+    Load the summary CSV and prepare it for the dashboard (country names, ISO3 map codes,
+    numeric year columns and parsed year lists).
+    """
     print(f"Loading data from {inventory_json_path} and {summary_csv_path}")
     
     # Load the data
     try:
-        with open(inventory_json_path, 'r') as f:
+        with open(inventory_json_path, 'r', encoding='utf-8') as f:
             inventory = json.load(f)
         
         summary_df = pd.read_csv(summary_csv_path)
@@ -36,39 +207,28 @@ def create_dashboard(inventory_json_path, summary_csv_path, country_mapping_file
     except Exception as e:
         raise Exception(f"Error loading data: {e}")
         
-    # Import country mapping
-    try:
-        from inventory_utils import load_country_mapping
-        country_mapping = load_country_mapping(country_mapping_file)
-    except ImportError:
-        # Simple fallback
-        country_mapping = {code: f"Country {code}" for code in summary_df['country_code'].unique()}
-    
-    # Get the directory where dashboard.py is located (crop_inventory folder)
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    
-    # Go up one level to the project root, then into the data folder
-    data_dir = os.path.join(os.path.dirname(current_dir), "data")
-    country_code_path = os.path.join(data_dir, "country_codes_with_iso3.csv")
-    country_names = pd.read_csv(country_code_path)
-    
-    # Add country names to summary dataframe
-    summary_df['country_name'] = summary_df['country_code'].map(
-        lambda x: country_mapping.get(x, f"Country {x}")
+    country_names = pd.read_csv(
+        country_code_path,
+        usecols=['ISO2_Code', 'ISO3_Code', 'Country_Name'],
+        dtype={'ISO2_Code': 'category', 'ISO3_Code': 'category'}
     )
     
-    # Match summary_df country codes to ISO2_Code in country_df and extract Country_Name
-    summary_df = summary_df.merge(country_names[['ISO2_Code', 'ISO3_Code', 'Country_Name']], left_on='country_code', right_on='ISO2_Code', how='left')
+    # Add country names by matching summary_df country codes to ISO2_Code and extracting Country_Name
+    summary_df = summary_df.merge(country_names, left_on='country_code', right_on='ISO2_Code', how='left')
     summary_df['country_name'] = summary_df['Country_Name']
     summary_df['map_code'] = summary_df['ISO3_Code']
     print(summary_df['map_code'].unique())
     #summary_df.drop(columns=['ISO2_Code', 'ISO3_Code', 'Country_Name'], inplace=True)
     
     # Fix any potential NaN issues in the DataFrame
-    for col in ['year_min', 'year_max']:
+    for col in ['year_min', 'year_max', 'year_count']:
         if col in summary_df.columns:
-            # Convert non-numeric values to NaN, then fill with sensible defaults
-            summary_df[col] = pd.to_numeric(summary_df[col], errors='coerce')
+            # Convert non-numeric values to missing and store years as small nullable ints
+            summary_df[col] = pd.to_numeric(summary_df[col], errors='coerce').astype('Int16')
+    
+    # Availability flags as 1-byte booleans
+    for col in ['has_area_planted', 'has_area_harvested', 'has_quantity', 'has_production']:
+        summary_df[col] = summary_df[col].astype(np.bool_)
     
     # Expand the years column into a list of years
     if 'years' in summary_df.columns and isinstance(summary_df['years'].iloc[0], str):
@@ -76,20 +236,127 @@ def create_dashboard(inventory_json_path, summary_csv_path, country_mapping_file
             lambda x: [int(y) for y in x.strip('[]').split(',') if y.strip()]
         )
     
+    # Store repeated strings as categoricals so filters and groupbys work on integer codes
+    for col in ['country_code', 'country_name', 'crop', 'map_code', 'seasonality']:
+        summary_df[col] = summary_df[col].astype('category')
+    
+    return summary_df
+
+
+def create_dashboard(inventory_json_path, summary_csv_path, country_mapping_file=None, country_summary_path=None):
+    """
+    Create a Dash application to visualize the crop inventory.
+    """
+    # Check if files exist
+    for path in [inventory_json_path, summary_csv_path]:
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"File not found: {path}")
+    
+    # Use the provided mapping file, falling back to the bundled copy in the data folder
+    country_code_path = country_mapping_file
+    if not country_code_path or not os.path.exists(country_code_path):
+        current_dir = os.path.dirname(os.path.abspath(__file__))
+        data_dir = os.path.join(os.path.dirname(current_dir), "data")
+        country_code_path = os.path.join(data_dir, "country_codes_with_iso3.csv")
+    
+    # Preprocessed snapshot of summary_df, keyed by the cache format version and
+    # the source files' modification times
+    cache_path = None
+    try:
+        import pyarrow  # noqa: F401 - parquet engine
+        source_paths = [p for p in [inventory_json_path, summary_csv_path, country_summary_path, country_code_path] if p and os.path.exists(p)]
+        cache_key = hashlib.sha1(str([SUMMARY_CACHE_VERSION] + [(p, os.path.getmtime(p)) for p in source_paths]).encode()).hexdigest()
+        cache_path = os.path.join(os.path.dirname(os.path.abspath(summary_csv_path)), ".cache", f"{cache_key}.parquet")
+    except ImportError:
+        print("Warning: pyarrow not available, preprocessed data will not be cached")
+    
+    summary_df = None
+    if cache_path and os.path.exists(cache_path):
+        try:
+            summary_df = pd.read_parquet(cache_path, engine='pyarrow')
+            print(f"Loaded preprocessed data from {cache_path}")
+        except Exception as e:
+            print(f"Warning: could not read cached preprocessed data, rebuilding it: {e}")
+    
+    if summary_df is None:
+        summary_df = load_summary_data(inventory_json_path, summary_csv_path, country_code_path, country_summary_path)
+        if cache_path:
+            try:
+                cache_dir = os.path.dirname(cache_path)
+                os.makedirs(cache_dir, exist_ok=True)
+                
+                # Write under a per-process temporary name and move it into place, so
+                # a partial file is never read and concurrent workers don't collide
+                tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+                summary_df.to_parquet(tmp_path, engine='pyarrow', compression='zstd', index=False)
+                os.replace(tmp_path, cache_path)
+                print(f"Cached preprocessed data to {cache_path}")
+                
+                # Snapshots of older source files are never read again
+                for entry in os.scandir(cache_dir):
+                    if entry.name.endswith('.parquet') and entry.path != cache_path:
+                        try:
+                            os.remove(entry.path)
+                        except OSError:
+                            pass
+            except Exception as e:
+                print(f"Warning: could not cache preprocessed data: {e}")
+    
     # Default values for year slider
     min_year = summary_df['year_min'].min() if not pd.isna(summary_df['year_min'].min()) else 1900
     max_year = summary_df['year_max'].max() if not pd.isna(summary_df['year_max'].max()) else 2023
-    
+
+    # Convert the per-row year lists into a dense (rows x years) presence matrix
+    # (lists when parsed from CSV, arrays when read back from the parquet cache)
+    year_lists = summary_df.pop('years') if 'years' in summary_df.columns else [[]] * len(summary_df)
+    year_lists = [lst if isinstance(lst, (list, np.ndarray)) else [] for lst in year_lists]
+    year_lengths = np.fromiter(map(len, year_lists), dtype=np.int64, count=len(year_lists))
+    flat_years = np.fromiter((y for lst in year_lists for y in lst), dtype=np.int32, count=int(year_lengths.sum()))
+    year_offset = int(min(flat_years.min(), min_year)) if flat_years.size else int(min_year)
+    n_years = (int(max(flat_years.max(), max_year)) if flat_years.size else int(max_year)) - year_offset + 1
+    years_mat = np.zeros((len(summary_df), n_years), dtype=np.uint8)
+    years_mat[np.repeat(np.arange(len(summary_df)), year_lengths), flat_years - year_offset] = 1
+    year_axis = np.arange(year_offset, year_offset + n_years)
+
+    # Precompute filter-invariant data once so callbacks only work on the filtered rows
+    HAS_COLS = ['has_area_planted', 'has_area_harvested', 'has_quantity', 'has_production']
+    has_arrays = {col: summary_df[col].to_numpy(dtype=np.uint8) for col in HAS_COLS}
+    # float32 holds every year exactly and keeps NaN for missing values at half the width of float64
+    year_min_arr = summary_df['year_min'].to_numpy(dtype=np.float32, na_value=np.nan)
+    year_max_arr = summary_df['year_max'].to_numpy(dtype=np.float32, na_value=np.nan)
+    # Year values never change after loading, so decide once whether the year filter can apply
+    year_filter_applicable = not (np.isnan(year_min_arr).all() or np.isnan(year_max_arr).all())
+
+    code_lookup = summary_df[['country_code', 'country_name', 'map_code']].drop_duplicates('country_code')
+    country_name_by_code = dict(zip(code_lookup['country_code'], code_lookup['country_name']))
+    map_code_by_code = dict(zip(code_lookup['country_code'], code_lookup['map_code']))
+
+    # Top 20 rankings for the unfiltered Countries x Crops heatmap
+    top_countries_all = summary_df.groupby('country_code', observed=True)['crop'].nunique().sort_values(ascending=False).head(20).index
+    top_crops_all = summary_df.groupby('crop', observed=True)['country_code'].nunique().sort_values(ascending=False).head(20).index
+
+    # Dropdown options, sorted by country name / crop
+    opts_df = summary_df[['country_code', 'country_name']].drop_duplicates().sort_values('country_name')
+    country_options = [
+        {"label": name if isinstance(name, str) else code, "value": code}
+        for code, name in zip(opts_df['country_code'], opts_df['country_name'])
+    ]
+    crop_options = [{"label": crop, "value": crop} for crop in np.sort(summary_df['crop'].dropna().unique().to_numpy())]
+
     # Display clear warnings for any data issues
     print(f"Data summary: {len(summary_df)} records, {summary_df['country_code'].nunique()} countries, {summary_df['crop'].nunique()} crops")
     print(f"Year range: {min_year} to {max_year}")
     
     # Initialize Dash app
-    app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP])
+    # The data table is created inside a callback, so its callbacks reference ids not yet in the layout
+    app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP], suppress_callback_exceptions=True)
     app.title = "Crop Data Inventory Dashboard"
     
     # Define the layout
     app.layout = dbc.Container([
+        # Canonical filter values shared by the output callbacks
+        dcc.Store(id="filtered-store"),
+        
         dbc.Row([
             dbc.Col([
                 html.H1("Crop Data Inventory Dashboard", className="text-center my-4"),
@@ -139,16 +406,7 @@ def create_dashboard(inventory_json_path, summary_csv_path, country_mapping_file
                         html.Label("Select Countries:"),
                         dcc.Dropdown(
                             id="country-dropdown",
-                            options=[
-                                {
-                                    "label": name, 
-                                    "value": code
-                                }
-                                for code, name in sorted(
-                                    zip(summary_df['country_code'].unique(), summary_df['country_name'].unique()), 
-                                    key=lambda x: x[1]  # Sort by country name
-                                )
-                            ],
+                            options=country_options,
                             multi=True,
                             placeholder="Select countries...",
                             className="mb-3"
@@ -157,10 +415,7 @@ def create_dashboard(inventory_json_path, summary_csv_path, country_mapping_file
                         html.Label("Select Crops:"),
                         dcc.Dropdown(
                             id="crop-dropdown",
-                            options=[
-                                {"label": crop, "value": crop}
-                                for crop in sorted(summary_df['crop'].unique())
-                            ],
+                            options=crop_options,
                             multi=True,
                             placeholder="Select crops...",
                             className="mb-3"
@@ -203,7 +458,7 @@ def create_dashboard(inventory_json_path, summary_csv_path, country_mapping_file
             dbc.Col([
                 dbc.Tabs([
                     dbc.Tab([
-                        dcc.Graph(id="map-graph", style={"height": "70vh"})
+                        dcc.Graph(id="map-graph", figure=map_figure(), style={"height": "70vh"})
                     ], label="Geographic View"),
                     
                     dbc.Tab([
@@ -239,81 +494,99 @@ def create_dashboard(inventory_json_path, summary_csv_path, country_mapping_file
         ])
     ], fluid=True)
     
-    # Define callbacks
-    @app.callback(
-        [
-            Output("map-graph", "figure"),
-            Output("heatmap-graph", "figure"),
-            Output("indicator-graph", "figure"),
-            Output("summary-stats", "children"),
-            Output("data-table", "children")
-        ],
-        [
-            Input("country-dropdown", "value"),
-            Input("crop-dropdown", "value"),
-            Input("year-slider", "value"),
-            Input("metrics-checklist", "value")
-        ]
-    )
-    def update_graphs(selected_countries, selected_crops, year_range, required_metrics):
-        # Filter the dataframe based on selections
-        filtered_df = summary_df.copy()
+    def year_presence(keys, mat):
+        """
+        Reduce the presence rows of the filtered records to one row per key,
+        keeping only the years that have data.
+        """
+        codes, labels = pd.factorize(keys, sort=True)
+        valid = codes >= 0
+        out = np.zeros((len(labels), n_years), dtype=np.uint8)
+        np.maximum.at(out, codes[valid], mat[valid])
+        has_year = out.any(axis=0)
+        return pd.DataFrame(out[:, has_year], index=labels, columns=year_axis[has_year])
+    
+    def canonical_filters(selected_countries, selected_crops, year_range, required_metrics):
+        """
+        Turn the filter control values into hashable cache keys.
+        """
+        return (
+            tuple(sorted(selected_countries or ())),
+            tuple(sorted(selected_crops or ())),
+            tuple(year_range) if year_range else None,
+            tuple(sorted(required_metrics or ()))
+        )
+    
+    @lru_cache(maxsize=128)
+    def filter_mask(selected_countries, selected_crops, year_range, required_metrics):
+        """
+        Row mask over summary_df for the given (canonical) filter values.
+        """
+        mask = np.ones(len(summary_df), dtype=bool)
         
         if selected_countries:
-            filtered_df = filtered_df[filtered_df['country_code'].isin(selected_countries)]
+            mask &= summary_df['country_code'].isin(selected_countries).to_numpy()
         
         if selected_crops:
-            filtered_df = filtered_df[filtered_df['crop'].isin(selected_crops)]
+            mask &= summary_df['crop'].isin(selected_crops).to_numpy()
         
         # Filter by years if we have valid year data
-        if year_range and not (pd.isna(filtered_df['year_min']).all() or pd.isna(filtered_df['year_max']).all()):
-            filtered_df = filtered_df[
-                (filtered_df['year_min'] >= year_range[0]) & 
-                (filtered_df['year_max'] <= year_range[1])
-            ]
+        if year_range and year_filter_applicable:
+            # AND each comparison straight into the mask rather than combining temporaries first
+            mask &= year_min_arr >= year_range[0]
+            mask &= year_max_arr <= year_range[1]
         
         # Filter by required metrics
-        if required_metrics:
-            for metric, column in zip(
-                ['area_planted', 'area_harvested', 'quantity', 'production'],
-                ['has_area_planted', 'has_area_harvested', 'has_quantity', 'has_production']
-            ):
-                if metric in required_metrics:
-                    filtered_df = filtered_df[filtered_df[column] == True]
+        for metric, column in zip(
+            ['area_planted', 'area_harvested', 'quantity', 'production'],
+            HAS_COLS
+        ):
+            if metric in (required_metrics or ()):
+                mask &= summary_df[column].to_numpy()
         
-        # Create map figure - Using ISO3 codes for better map visualization
-        if not filtered_df.empty:
-            # Group data by country
-            map_data = filtered_df.groupby(['map_code', 'country_name']).agg({
-                'crop': 'nunique',
-                }).reset_index()
-
-            # Create choropleth map
-            map_fig = px.choropleth(
-                map_data,
-                locations='map_code',
-                color='crop',
-                hover_name='country_name',
-                locationmode='ISO-3',  # Explicitly use ISO-3 codes for mapping
-                color_continuous_scale=px.colors.sequential.Viridis,
-                labels={'crop': 'Number of Crops'},
-                title="Crop Data Coverage by Country"
-            )
-            
-            # Improve map layout
-            map_fig.update_layout(
-                geo=dict(
-                    showframe=False,
-                    showcoastlines=True,
-                    projection_type='equirectangular'
-                ),
-                margin={"r":0,"t":40,"l":0,"b":0}
-            )
-        else:
-            map_fig = go.Figure()
-            map_fig.update_layout(
-                title="No data available for the selected filters"
-            )
+        # Shared between callbacks through the cache, so guard against in-place edits
+        mask.flags.writeable = False
+        return mask
+    
+    @lru_cache(maxsize=32)
+    def filtered_frame(filters):
+        """
+        Rows of summary_df matching the (canonical) filter values.
+        """
+        return summary_df[filter_mask(*filters)]
+    
+    # Each output depends only on the filter values, so repeated selections are served from cache.
+    # Figures are returned pre-serialized so cache hits skip the JSON encoding.
+    @lru_cache(maxsize=128)
+    def map_aggregate(filters):
+        """
+        Number of crops per country as plain lists, ready to be stashed in filtered-store.
+        """
+        filtered_df = filtered_frame(filters)
+        
+        # Group data by country and attach names/ISO3 codes from the lookups
+        crop_counts = filtered_df.groupby('country_code', observed=True)['crop'].nunique()
+        map_data = pd.DataFrame({
+            'map_code': crop_counts.index.map(map_code_by_code),
+            'country_name': crop_counts.index.map(country_name_by_code),
+            'crop': crop_counts.to_numpy()
+        }).dropna(subset=['map_code', 'country_name'])
+        
+        return {
+            'map_code': map_data['map_code'].astype(str).tolist(),
+            'country_name': map_data['country_name'].astype(str).tolist(),
+            'crop': map_data['crop'].astype(int).tolist()
+        }
+    
+    @lru_cache(maxsize=128)
+    def heatmap_figure(filters):
+        """
+        Data coverage heatmap, chosen by how many countries/crops are selected.
+        """
+        selected_countries, selected_crops, year_range, required_metrics = filters
+        mask = filter_mask(*filters)
+        filtered_df = filtered_frame(filters)
+        is_unfiltered = len(filtered_df) == len(summary_df)
         
         # Create heatmap figure
         if not filtered_df.empty:
@@ -322,51 +595,28 @@ def create_dashboard(inventory_json_path, summary_csv_path, country_mapping_file
                 # Case 1: One crop, multiple countries - Show Countries x Years
                 heatmap_title = f"Data Availability: {selected_crops[0]} by Country and Year"
                 
-                # Create a matrix of countries x years
-                all_years = set()
-                for years_list in filtered_df['years']:
-                    all_years.update(years_list)
-                all_years = sorted(list(all_years))
-                
-                # Create a new dataframe for the heatmap
-                country_year_data = []
+                # Binary matrix of countries x years (has data or not)
+                heatmap_df = bound_heatmap(year_presence(filtered_df['country_name'], years_mat[mask]))
                 
-                for _, row in filtered_df.iterrows():
-                    country = row['country_name']
-                    for year in row['years']:
-                        country_year_data.append({
-                            'Country': country,
-                            'Year': year,
-                            'Has Data': 1  # Binary presence indicator
-                        })
-                
-                if country_year_data:
-                    country_year_df = pd.DataFrame(country_year_data)
-                    
-                    # Pivot to create the heatmap matrix
-                    heatmap_df = country_year_df.pivot_table(
-                        index='Country',
-                        columns='Year',
-                        values='Has Data',
-                        aggfunc='sum',
-                        fill_value=0
-                    )
-                    
-                    # Binary heatmap (has data or not)
-                    heatmap_df = (heatmap_df > 0).astype(int)
-                    
+                if not heatmap_df.empty:
                     # Create the heatmap
-                    heatmap_fig = px.imshow(
-                        heatmap_df,
-                        color_continuous_scale=[[0, 'white'], [1, 'green']],
-                        labels=dict(x="Year", y="Country", color="Has Data"),
-                        title=heatmap_title
-                    )
+                    heatmap_fig = go.Figure(go.Heatmap(
+                        z=heatmap_df.to_numpy(),
+                        x=heatmap_df.columns.to_numpy(),
+                        y=heatmap_df.index.to_numpy(),
+                        colorscale=[[0, 'white'], [1, 'green']],
+                        zmin=0,
+                        zmax=1,
+                        showscale=False,
+                        hovertemplate='Year: %{x}<br>Country: %{y}<br>Has Data: %{z}<extra></extra>'
+                    ))
                     
                     # Improve layout
                     heatmap_fig.update_layout(
-                        xaxis=dict(tickmode='array', tickvals=list(heatmap_df.columns)),
-                        coloraxis_showscale=False
+                        title=heatmap_title,
+                        xaxis=dict(title='Year', tickmode='array', tickvals=list(heatmap_df.columns)),
+                        yaxis=dict(title='Country', autorange='reversed'),
+                        uirevision='heatmap-countries-years'
                     )
                 else:
                     heatmap_fig = go.Figure()
@@ -377,51 +627,28 @@ def create_dashboard(inventory_json_path, summary_csv_path, country_mapping_file
                 country_name = filtered_df['country_name'].iloc[0]
                 heatmap_title = f"Data Availability: {country_name} by Crop and Year"
                 
-                # Create a matrix of crops x years
-                all_years = set()
-                for years_list in filtered_df['years']:
-                    all_years.update(years_list)
-                all_years = sorted(list(all_years))
-                
-                # Create a new dataframe for the heatmap
-                crop_year_data = []
+                # Binary matrix of crops x years (has data or not)
+                heatmap_df = bound_heatmap(year_presence(filtered_df['crop'], years_mat[mask]))
                 
-                for _, row in filtered_df.iterrows():
-                    crop = row['crop']
-                    for year in row['years']:
-                        crop_year_data.append({
-                            'Crop': crop,
-                            'Year': year,
-                            'Has Data': 1  # Binary presence indicator
-                        })
-                
-                if crop_year_data:
-                    crop_year_df = pd.DataFrame(crop_year_data)
-                    
-                    # Pivot to create the heatmap matrix
-                    heatmap_df = crop_year_df.pivot_table(
-                        index='Crop',
-                        columns='Year',
-                        values='Has Data',
-                        aggfunc='sum',
-                        fill_value=0
-                    )
-                    
-                    # Binary heatmap (has data or not)
-                    heatmap_df = (heatmap_df > 0).astype(int)
-                    
+                if not heatmap_df.empty:
                     # Create the heatmap
-                    heatmap_fig = px.imshow(
-                        heatmap_df,
-                        color_continuous_scale=[[0, 'white'], [1, 'green']],
-                        labels=dict(x="Year", y="Crop", color="Has Data"),
-                        title=heatmap_title
-                    )
+                    heatmap_fig = go.Figure(go.Heatmap(
+                        z=heatmap_df.to_numpy(),
+                        x=heatmap_df.columns.to_numpy(),
+                        y=heatmap_df.index.to_numpy(),
+                        colorscale=[[0, 'white'], [1, 'green']],
+                        zmin=0,
+                        zmax=1,
+                        showscale=False,
+                        hovertemplate='Year: %{x}<br>Crop: %{y}<br>Has Data: %{z}<extra></extra>'
+                    ))
                     
                     # Improve layout
                     heatmap_fig.update_layout(
-                        xaxis=dict(tickmode='array', tickvals=list(heatmap_df.columns)),
-                        coloraxis_showscale=False
+                        title=heatmap_title,
+                        xaxis=dict(title='Year', tickmode='array', tickvals=list(heatmap_df.columns)),
+                        yaxis=dict(title='Crop', autorange='reversed'),
+                        uirevision='heatmap-crops-years'
                     )
                 else:
                     heatmap_fig = go.Figure()
@@ -431,8 +658,12 @@ def create_dashboard(inventory_json_path, summary_csv_path, country_mapping_file
                 # Case 3: Default view - Show Countries x Crops
                 # Limit to top 20 countries and top 20 crops for readability if needed
                 if len(filtered_df['country_code'].unique()) > 20 or len(filtered_df['crop'].unique()) > 20:
-                    top_countries = filtered_df.groupby('country_code')['crop'].nunique().sort_values(ascending=False).head(20).index
-                    top_crops = filtered_df.groupby('crop')['country_code'].nunique().sort_values(ascending=False).head(20).index
+                    if is_unfiltered:
+                        top_countries = top_countries_all
+                        top_crops = top_crops_all
+                    else:
+                        top_countries = filtered_df.groupby('country_code', observed=True)['crop'].nunique().sort_values(ascending=False).head(20).index
+                        top_crops = filtered_df.groupby('crop', observed=True)['country_code'].nunique().sort_values(ascending=False).head(20).index
                     
                     heatmap_df = filtered_df[
                         filtered_df['country_code'].isin(top_countries) & 
@@ -445,27 +676,31 @@ def create_dashboard(inventory_json_path, summary_csv_path, country_mapping_file
                     heatmap_title = "Data Coverage: Countries × Crops"
                 
                 # Create a matrix of countries x crops showing the year span
-                if not heatmap_df.empty:
-                    pivot_df = heatmap_df.pivot_table(
-                        index='country_name',
-                        columns='crop',
-                        values='year_count',
-                        aggfunc='max',
-                        fill_value=0
-                    )
+                cells = heatmap_df.dropna(subset=['country_name', 'crop'])
+                if not cells.empty:
+                    # Scatter the year counts straight into the matrix (max per country/crop pair)
+                    country_idx, countries = pd.factorize(cells['country_name'], sort=True)
+                    crop_idx, crops = pd.factorize(cells['crop'], sort=True)
+                    pivot = np.zeros((len(countries), len(crops)), dtype=np.int16)
+                    np.maximum.at(pivot, (country_idx, crop_idx), cells['year_count'].fillna(0).to_numpy(dtype=np.int16))
+                    pivot_df = pd.DataFrame(pivot, index=countries, columns=crops)
                     
                     # Create the heatmap
-                    heatmap_fig = px.imshow(
-                        pivot_df,
-                        color_continuous_scale=px.colors.sequential.Viridis,
-                        labels=dict(x="Crop", y="Country", color="Years of Data"),
-                        title=heatmap_title
-                    )
+                    heatmap_fig = go.Figure(go.Heatmap(
+                        z=pivot_df.to_numpy(),
+                        x=pivot_df.columns.to_numpy(),
+                        y=pivot_df.index.to_numpy(),
+                        colorscale='Viridis',
+                        colorbar=dict(title=dict(text='Years of Data')),
+                        hovertemplate='Crop: %{x}<br>Country: %{y}<br>Years of Data: %{z}<extra></extra>'
+                    ))
                     
                     # Improve layout
                     heatmap_fig.update_layout(
+                        title=heatmap_title,
                         xaxis={'title': 'Crop'},
-                        yaxis={'title': 'Country'},
+                        yaxis={'title': 'Country', 'autorange': 'reversed'},
+                        uirevision='heatmap-countries-crops'
                     )
                 else:
                     heatmap_fig = go.Figure()
@@ -476,40 +711,52 @@ def create_dashboard(inventory_json_path, summary_csv_path, country_mapping_file
                 title="No data available for heatmap with selected filters"
             )
         
+        return json.loads(heatmap_fig.to_json())
+    
+    @lru_cache(maxsize=128)
+    def indicator_figure(filters):
+        """
+        Bar chart of indicator availability in the filtered records.
+        """
+        mask = filter_mask(*filters)
+        filtered_df = filtered_frame(filters)
+        
         # Create indicator availability figure
         if not filtered_df.empty:
             # Prepare data for bar graph
-            indicator_data = {
-                'Indicator': ['Area Planted', 'Area Harvested', 'Quantity Produced', 'Production'],
-                'Available': [
-                    filtered_df['has_area_planted'].mean() * 100,
-                    filtered_df['has_area_harvested'].mean() * 100,
-                    filtered_df['has_quantity'].mean() * 100,
-                    filtered_df['has_production'].mean() * 100
-                ]
-            }
-            
-            indicator_df = pd.DataFrame(indicator_data)
+            indicators = ['Area Planted', 'Area Harvested', 'Quantity Produced', 'Production']
+            available = [has_arrays[col][mask].mean() * 100 for col in HAS_COLS]
             
             # Create bar chart
-            indicator_fig = px.bar(
-                indicator_df,
-                x='Indicator',
-                y='Available',
+            indicator_fig = go.Figure(go.Bar(
+                x=indicators,
+                y=available,
+                text=[f"{value:.1f}" for value in available],
+                marker_color=px.colors.qualitative.Safe[:len(indicators)],
+                hovertemplate='Indicator: %{x}<br>Percentage Available (%): %{y:.1f}<extra></extra>'
+            ))
+            
+            indicator_fig.update_layout(
                 title="Indicator Availability in Selected Data (%)",
-                labels={'Available': 'Percentage Available (%)'},
-                color='Indicator',
-                text_auto='.1f',
-                color_discrete_sequence=px.colors.qualitative.Safe
+                xaxis_title='Indicator',
+                yaxis_title='Percentage Available (%)',
+                yaxis_range=[0, 100]
             )
-            
-            indicator_fig.update_layout(yaxis_range=[0, 100])
         else:
             indicator_fig = go.Figure()
             indicator_fig.update_layout(
                 title="No data available for indicator graph with selected filters"
             )
         
+        return json.loads(indicator_fig.to_json())
+    
+    @lru_cache(maxsize=128)
+    def summary_children(filters):
+        """
+        Record, country, crop and year counts for the filtered records.
+        """
+        filtered_df = filtered_frame(filters)
+        
         # Summary statistics
         if not filtered_df.empty:
             summary_stats = html.Div([
@@ -523,15 +770,22 @@ def create_dashboard(inventory_json_path, summary_csv_path, country_mapping_file
                 html.P("Please adjust your filters to see results.")
             ])
         
+        return summary_stats
+    
+    @lru_cache(maxsize=128)
+    def table_children(filters):
+        """
+        Inventory table shell; its rows are served by update_table_page.
+        """
+        filtered_df = filtered_frame(filters)
+        
         # Data table with pagination
         if not filtered_df.empty:
-            # Prepare data for table - use all records
-            table_df = filtered_df[['country_name', 'crop', 'year_range', 'seasonality', 'indicators_available']]
-            
-            # Create the data table with pagination
+            # Create the data table; pages are served by update_table_page
             table = dash_table.DataTable(
-                columns=[{"name": col.replace('_', ' ').title(), "id": col} for col in table_df.columns],
-                data=table_df.to_dict('records'),
+                id="data-table-actual",
+                columns=[{"name": col.replace('_', ' ').title(), "id": col} for col in TABLE_COLUMNS],
+                data=[],
                 style_table={'overflowX': 'auto'},
                 style_cell_conditional=[
                 {'if': {'column_id': 'country_name'}, 'width': '18%'},
@@ -559,14 +813,19 @@ def create_dashboard(inventory_json_path, summary_csv_path, country_mapping_file
                     'backgroundColor': 'rgb(248, 248, 248)'
                 }
             ],
-                page_size=15,  # Show 15 records per page
-                page_action='native',  # Enable built-in pagination
-                sort_action='native',  # Enable built-in sorting
-                filter_action='native',  # Enable built-in filtering
+                page_current=0,
+                page_size=TABLE_PAGE_SIZE,  # Show 15 records per page
+                page_count=math.ceil(len(filtered_df) / TABLE_PAGE_SIZE),
+                page_action='custom',  # Pagination, sorting and filtering run server-side
+                sort_action='custom',
+                sort_mode='multi',
+                sort_by=[],
+                filter_action='custom',
+                filter_query='',
             )
             
             data_table = html.Div([
-                html.H5(f"Data Inventory ({len(table_df)} Records)"),
+                html.H5(f"Data Inventory ({len(filtered_df)} Records)"),
                 table,
                 html.P("Use the pagination controls to view more records. You can also sort by any column by clicking the header.")
             ])
@@ -576,7 +835,93 @@ def create_dashboard(inventory_json_path, summary_csv_path, country_mapping_file
                 html.P("Please adjust your filters to see results.")
             ])
         
-        return map_fig, heatmap_fig, indicator_fig, summary_stats, data_table
+        return data_table
+    
+    def filters_from_store(data):
+        """
+        Rebuild the hashable filter key from the JSON stored in filtered-store.
+        """
+        if not data:
+            raise dash.exceptions.PreventUpdate
+        selected_countries, selected_crops, year_range, required_metrics = data['filters']
+        return (
+            tuple(selected_countries),
+            tuple(selected_crops),
+            tuple(year_range) if year_range else None,
+            tuple(required_metrics)
+        )
+    
+    # Define callbacks
+    # Filter callback - stores the canonical filter values shared by the output callbacks
+    @app.callback(
+        Output("filtered-store", "data"),
+        [
+            Input("country-dropdown", "value"),
+            Input("crop-dropdown", "value"),
+            Input("year-slider", "value"),
+            Input("metrics-checklist", "value")
+        ]
+    )
+    def update_filter_store(selected_countries, selected_crops, year_range, required_metrics):
+        filters = canonical_filters(selected_countries, selected_crops, year_range, required_metrics)
+        return {
+            'filters': filters,
+            'map_agg': map_aggregate(filters)
+        }
+    
+    @app.callback(Output("map-graph", "figure"), Input("filtered-store", "data"))
+    def update_map(data):
+        if not data:
+            raise dash.exceptions.PreventUpdate
+        map_agg = data['map_agg']
+        
+        # Only swap the trace data so Plotly keeps the rendered geo layer
+        patched_fig = dash.Patch()
+        patched_fig['data'][0]['locations'] = map_agg['map_code']
+        patched_fig['data'][0]['z'] = map_agg['crop']
+        patched_fig['data'][0]['text'] = map_agg['country_name']
+        patched_fig['layout']['title']['text'] = map_title(map_agg)
+        return patched_fig
+    
+    @app.callback(Output("heatmap-graph", "figure"), Input("filtered-store", "data"))
+    def update_heatmap(data):
+        return heatmap_figure(filters_from_store(data))
+    
+    @app.callback(Output("indicator-graph", "figure"), Input("filtered-store", "data"))
+    def update_indicators(data):
+        return indicator_figure(filters_from_store(data))
+    
+    @app.callback(Output("summary-stats", "children"), Input("filtered-store", "data"))
+    def update_summary(data):
+        return summary_children(filters_from_store(data))
+    
+    @app.callback(Output("data-table", "children"), Input("filtered-store", "data"))
+    def update_table(data):
+        return table_children(filters_from_store(data))
+    
+    # Data table callback - sends only the visible page of the filtered rows
+    @app.callback(
+        [
+            Output("data-table-actual", "data"),
+            Output("data-table-actual", "page_count")
+        ],
+        [
+            Input("data-table-actual", "page_current"),
+            Input("data-table-actual", "page_size"),
+            Input("data-table-actual", "sort_by"),
+            Input("data-table-actual", "filter_query")
+        ],
+        State("filtered-store", "data")
+    )
+    def update_table_page(page_current, page_size, sort_by, filter_query, data):
+        mask = filter_mask(*filters_from_store(data))
+        table_df = query_table(summary_df.loc[mask, TABLE_COLUMNS], sort_by, filter_query)
+        
+        page_size = page_size or TABLE_PAGE_SIZE
+        start = (page_current or 0) * page_size
+        page_count = max(1, math.ceil(len(table_df) / page_size))
+        
+        return table_df.iloc[start:start + page_size].to_dict('records'), page_count
     
     # Reset button callback
     @app.callback(
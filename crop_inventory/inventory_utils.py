@@ -1,245 +1,480 @@
 import os
 import pandas as pd
+import numpy as np
 import json
-from collections import defaultdict
+import hashlib
+import importlib.util
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 import re
 from pathlib import Path
-from datetime import datetime
 
-def create_crop_inventory(root_directory):
+# pyarrow is optional; its multithreaded CSV reader is used when available
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+except ImportError:
+    pa = None
+    pa_csv = None
+
+# Region columns, most detailed first
+ADMIN_LEVELS = ['admin_4', 'admin_3', 'admin_2', 'admin_1', 'admin_0']
+
+# Date columns (and formats) tried in order when season_year is not a number
+DATE_FIELDS = ['start_date', 'period_date', 'harvest_end_date']
+DATE_FORMATS = ['%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y', '%Y']
+
+# Crop data files, e.g. LA_cropdata.csv
+CROP_FILE_RE = re.compile(r'cropdata', re.IGNORECASE)
+
+# Bump when the cached country mapping format changes
+COUNTRY_MAPPING_CACHE_VERSION = 2
+
+# Columns of the crop data files used for the inventory; the rest are never parsed
+CSV_COLUMNS = [
+    'country_code', 'product', 'cpcv2_description', 'season_year',
+    'start_date', 'period_date', 'harvest_end_date', 'season_name', 'season_type',
+    'admin_0', 'admin_1', 'admin_2', 'admin_3', 'admin_4', 'geographic_unit_name',
+    'indicator', 'indicator_group', 'source_organization', 'source_document'
+]
+
+# Rows read at a time, to cap memory on very large files
+CSV_CHUNK_SIZE = 250_000
+
+# Bytes parsed at a time by the streaming pyarrow reader
+CSV_BLOCK_SIZE = 4 << 20
+
+# Low-cardinality columns read as categoricals: the country code is the grouping
+# key, and the indicator patterns only need to be matched once per category
+CSV_DTYPES = {
+    'country_code': 'category',
+    'indicator': 'category',
+    'indicator_group': 'category'
+}
+
+# Bit of each availability flag in a CropEntry's packed flags
+FLAG_BITS = {
+    'area_planted': 1,
+    'area_harvested': 2,
+    'quantity_produced': 4,
+    'production': 8
+}
+
+# Indicator patterns flagging each metric, compiled once for every file
+PLANTED_RE = re.compile(r'planted|planting', re.IGNORECASE)
+HARVESTED_RE = re.compile(r'harvested|harvesting', re.IGNORECASE)
+PRODUCTION_RE = re.compile(r'yield|production', re.IGNORECASE)
+QUANTITY_RE = re.compile(r'quantity|volume|output', re.IGNORECASE)
+
+# Indicator group patterns, used for rows the indicator did not flag
+GROUP_AREA_RE = re.compile(r'area', re.IGNORECASE)
+GROUP_PRODUCTION_RE = re.compile(r'production', re.IGNORECASE)
+GROUP_QUANTITY_RE = re.compile(r'quantity|yield', re.IGNORECASE)
+
+# Flags set by each pattern
+INDICATOR_PATTERNS = [
+    (PLANTED_RE, FLAG_BITS['area_planted']),
+    (HARVESTED_RE, FLAG_BITS['area_harvested']),
+    (PRODUCTION_RE, FLAG_BITS['production']),
+    (QUANTITY_RE, FLAG_BITS['quantity_produced'])
+]
+GROUP_PATTERNS = [
+    (GROUP_AREA_RE, FLAG_BITS['area_planted'] | FLAG_BITS['area_harvested']),
+    (GROUP_PRODUCTION_RE, FLAG_BITS['production']),
+    (GROUP_QUANTITY_RE, FLAG_BITS['quantity_produced'])
+]
+
+# Display names of the availability flags, in FLAG_BITS order
+INDICATOR_NAMES = ['Area Planted', 'Area Harvested', 'Quantity Produced', 'Production']
+
+def _column(df, name):
+    """
+    Column of df, or an all-missing column if the file does not have it.
+    """
+    if name in df.columns:
+        return df[name]
+    return pd.Series(None, index=df.index, dtype=object)
+
+def _pattern_flags(column, patterns):
+    """
+    Packed availability flags of each row of column, from (pattern, bits) pairs.
+    
+    The patterns are matched once per distinct value rather than once per row,
+    and the flags are then taken for each row by its value's code.
+    """
+    codes, uniques = pd.factorize(column)
+    values = pd.Series(uniques, dtype=object).astype(str)
+    # One extra slot, left at 0, for the missing values (code -1)
+    value_flags = np.zeros(len(uniques) + 1, dtype=np.uint8)
+    for pattern, bits in patterns:
+        value_flags[:-1] |= values.str.contains(pattern).to_numpy(dtype=np.uint8) * bits
+    return value_flags[codes]
+
+def _years_from_dates(df):
+    """
+    Year of the first date column that parses with one of DATE_FORMATS, per row.
+    
+    Date strings are bucketed by separator, so each format is only tried on the
+    strings it could match and rows stop being parsed once they have a year.
+    """
+    year = pd.Series(np.nan, index=df.index)
+    for field in DATE_FIELDS:
+        dates = _column(df, field)
+        has_dash = dates.str.contains('-', regex=False, na=False)
+        has_slash = dates.str.contains('/', regex=False, na=False)
+        buckets = {'-': has_dash, '/': has_slash, '': dates.notna() & ~has_dash & ~has_slash}
+        for fmt in DATE_FORMATS:
+            separator = '-' if '-' in fmt else '/' if '/' in fmt else ''
+            todo = buckets[separator] & year.isna()
+            if todo.any():
+                year[todo] = pd.to_datetime(dates[todo], format=fmt, errors='coerce').dt.year
+    return year
+
+def _distinct_per_group(group_codes, n_groups, values):
+    """
+    Distinct non-missing values of each group, as one array per group.
+    
+    Each (group, value) pair is encoded as a single integer so the duplicates
+    are dropped by one np.unique over the whole column rather than per group.
+    """
+    if n_groups == 0:
+        return []
+    value_codes, uniques = pd.factorize(values)
+    present = value_codes >= 0
+    n_values = max(len(uniques), 1)
+    pairs = np.unique(group_codes[present].astype(np.int64) * n_values + value_codes[present])
+    bounds = np.searchsorted(pairs // n_values, np.arange(1, n_groups))
+    return [uniques[codes] for codes in np.split(pairs % n_values, bounds)]
+
+def _aggregate_crop_rows(df):
+    """
+    Aggregate the rows of one crop data file per (country_code, crop).
+    
+    Returns a DataFrame indexed by (country_code, crop) with the same fields as
+    a CropEntry: the distinct years, seasonality, regions, data_sources
+    and indicators, and the four availability flags packed into 'flags'; and
+    the number of rows whose season_year could not be parsed, even from the dates.
+    """
+    # Skip rows without a country code (without copying the chunk when none are missing)
+    has_country = _column(df, 'country_code').notna()
+    if not has_country.all():
+        df = df[has_country]
+    
+    # Look up the columns used more than once a single time
+    country_code = _column(df, 'country_code')
+    indicator = _column(df, 'indicator')
+    
+    # Crop from product, falling back to cpcv2_description
+    crop = _column(df, 'product').fillna(_column(df, 'cpcv2_description')).fillna('Unknown Crop')
+    
+    # Year from season_year; values that are present but not numeric fall back to the dates
+    season_year = _column(df, 'season_year')
+    year = pd.to_numeric(season_year, errors='coerce')
+    needs_dates = season_year.notna() & year.isna()
+    if needs_dates.any():
+        year[needs_dates] = _years_from_dates(df[needs_dates])
+    # Blank years are missing data; only present values that could not be parsed are errors
+    bad_year_mask = needs_dates & year.isna()
+    
+    # Seasonality from season_name, falling back to season_type
+    season = _column(df, 'season_name').fillna(_column(df, 'season_type')).fillna('Annual')
+    
+    # Most detailed region available, falling back to the geographic unit
+    region = _column(df, 'geographic_unit_name').fillna('National')
+    for admin_level in reversed(ADMIN_LEVELS):
+        region = _column(df, admin_level).fillna(region)
+    
+    # Use indicator information to flag availability, with the indicator group
+    # as fallback for rows the indicator did not flag
+    row_flags = _pattern_flags(indicator, INDICATOR_PATTERNS)
+    group_flags = _pattern_flags(_column(df, 'indicator_group'), GROUP_PATTERNS)
+    row_flags = np.where(row_flags == 0, group_flags, row_flags)
+    
+    # Data source from source_organization, falling back to source_document
+    source = _column(df, 'source_organization').fillna(_column(df, 'source_document')).fillna('Unknown')
+    
+    # Number the (country_code, crop) groups, in order of first appearance
+    grouped = pd.DataFrame({'country_code': country_code, 'crop': crop}) \
+        .groupby(['country_code', 'crop'], observed=True, sort=False)
+    group_codes = grouped.ngroup().to_numpy()
+    group_keys = grouped.size().index
+    
+    # OR the packed availability flags of each group's rows together
+    flags = np.zeros(len(group_keys), dtype=np.uint8)
+    np.bitwise_or.at(flags, group_codes, row_flags)
+    
+    years = _distinct_per_group(group_codes, len(group_keys), year)
+    aggregated = pd.DataFrame({
+        'years': [group_years.astype(int).tolist() for group_years in years],
+        'seasonality': _distinct_per_group(group_codes, len(group_keys), season),
+        'flags': flags,
+        'regions': _distinct_per_group(group_codes, len(group_keys), region),
+        'data_sources': _distinct_per_group(group_codes, len(group_keys), source),
+        'indicators': _distinct_per_group(group_codes, len(group_keys), indicator)
+    }, index=group_keys)
+    return aggregated, int(bad_year_mask.sum())
+
+@dataclass(slots=True)
+class CropEntry:
+    """
+    Data collected for one country/crop pair while the inventory is built.
+    
+    The four availability flags are packed into the bits of `flags` (see FLAG_BITS).
+    """
+    years: set = field(default_factory=set)
+    seasonality: set = field(default_factory=set)
+    flags: int = 0
+    regions: set = field(default_factory=set)
+    data_sources: set = field(default_factory=set)
+    indicators: set = field(default_factory=set)
+    
+    def merge(self, other):
+        """
+        Merge the values and flags of another entry, or of an aggregated row
+        with the same fields, into this entry.
+        """
+        self.years.update(other.years)
+        self.seasonality.update(other.seasonality)
+        self.flags |= int(other.flags)
+        self.regions.update(other.regions)
+        self.data_sources.update(other.data_sources)
+        self.indicators.update(other.indicators)
+    
+    def to_json(self):
+        """
+        JSON-ready inventory entry: sorted lists instead of sets, and the packed
+        flags unpacked into the four availability booleans.
+        """
+        # Years are plain ints, so they are sorted as one contiguous array
+        years = np.fromiter(self.years, dtype=np.int32, count=len(self.years))
+        return {
+            'years': np.sort(years).tolist(),
+            'seasonality': sorted(self.seasonality),
+            **{name: bool(self.flags & bit) for name, bit in FLAG_BITS.items()},
+            'regions': sorted(self.regions),
+            'data_sources': sorted(self.data_sources),
+            'indicators': sorted(self.indicators)
+        }
+
+def _find_crop_files(directory):
+    """
+    Yield the paths of the crop data files under directory, skipping hidden
+    directories. As with os.walk, a directory's files come before those of its
+    subdirectories and unreadable directories are skipped.
+    """
+    subdirectories = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if not entry.name.startswith('.'):
+                        subdirectories.append(entry.path)
+                elif CROP_FILE_RE.search(entry.name) and entry.is_file():
+                    yield entry.path
+    except OSError:
+        return
+    
+    for subdirectory in subdirectories:
+        yield from _find_crop_files(subdirectory)
+
+def _read_crop_csv(file_path):
+    """
+    Read a crop data file in chunks of about CSV_CHUNK_SIZE rows, keeping only
+    the columns the inventory uses.
+    
+    Uses pyarrow's streaming CSV reader when available, otherwise pandas. Both
+    read every column as text (categoricals for CSV_DTYPES), so values reach the
+    fallbacks unconverted and the inventory does not depend on the reader.
+    """
+    if pa_csv is None:
+        yield from pd.read_csv(
+            file_path,
+            usecols=lambda column: column in CSV_COLUMNS,
+            dtype={column: CSV_DTYPES.get(column, str) for column in CSV_COLUMNS},
+            chunksize=CSV_CHUNK_SIZE
+        )
+        return
+    
+    # Stream the file block by block, handing on about CSV_CHUNK_SIZE rows at a time
+    reader = pa_csv.open_csv(
+        file_path,
+        read_options=pa_csv.ReadOptions(block_size=CSV_BLOCK_SIZE),
+        convert_options=pa_csv.ConvertOptions(
+            column_types={
+                column: pa.dictionary(pa.int32(), pa.string()) if CSV_DTYPES.get(column) == 'category' else pa.string()
+                for column in CSV_COLUMNS
+            },
+            include_columns=CSV_COLUMNS,
+            include_missing_columns=True,
+            strings_can_be_null=True
+        )
+    )
+    batches = []
+    batch_rows = 0
+    for batch in reader:
+        batches.append(batch)
+        batch_rows += batch.num_rows
+        if batch_rows >= CSV_CHUNK_SIZE:
+            yield pa.Table.from_batches(batches).to_pandas()
+            batches = []
+            batch_rows = 0
+    if batches:
+        yield pa.Table.from_batches(batches).to_pandas()
+
+def _process_crop_file(file_path):
+    """
+    Read one crop data file and aggregate it per (country_code, crop).
+    
+    Runs in a worker process, so errors are returned instead of raised.
+    
+    Returns:
+    --------
+    tuple
+        (row count, number of rows with an unparseable year, dict mapping
+        (country_code, crop) to a CropEntry, error message or None)
+    """
+    file_inventory = {}
+    row_count = 0
+    bad_year_count = 0
+    try:
+        for df in _read_crop_csv(file_path):
+            row_count += len(df)
+            
+            # Aggregate the chunk per country/crop and merge into the file's entries
+            aggregated, bad_years = _aggregate_crop_rows(df)
+            bad_year_count += bad_years
+            for key, info in zip(aggregated.index, aggregated.itertuples(index=False)):
+                entry = file_inventory.get(key)
+                if entry is None:
+                    entry = file_inventory[key] = CropEntry()
+                entry.merge(info)
+    except Exception as e:
+        return row_count, bad_year_count, file_inventory, str(e)
+    
+    return row_count, bad_year_count, file_inventory, None
+
+def create_crop_inventory(root_directory, max_workers=None, verbose=False):
     """
     Traverse the M49 directory structure and create a comprehensive inventory
     of crop data from LA_cropdata.csv files.
+    
+    Files are processed in parallel by up to max_workers processes (defaults to
+    the number of CPUs). Rows whose season_year cannot be parsed are counted
+    as errors; set verbose to print every file as it is processed.
     """
-    # Structure to hold our inventory data
-    inventory = defaultdict(lambda: defaultdict(lambda: {
-        'years': set(),
-        'seasonality': set(),
-        'area_planted': False,
-        'area_harvested': False,
-        'quantity_produced': False,
-        'production': False,
-        'regions': set(),  
-        'data_sources': set(),  
-        'indicators': set()  
-    }))
+    # Structure to hold our inventory data, keyed by (country_code, crop)
+    inventory = {}
     
     # Track statistics for reporting
     file_count = 0
     row_count = 0
     error_count = 0
+    failed_files = 0
     country_set = set()
     crop_set = set()
     
-    # Walk through all directories
-    for dirpath, dirnames, filenames in os.walk(root_directory):
-        # Skip hidden directories
-        dirnames[:] = [d for d in dirnames if not d.startswith('.')]
-        
-        # Process CSV files
-        for filename in filenames:
-            if filename.lower() == 'la_cropdata.csv' or 'cropdata' in filename.lower():
-                try:
-                    file_path = os.path.join(dirpath, filename)
-                    print(f"Processing {file_path}")
-                    
-                    # Read the CSV file
-                    df = pd.read_csv(file_path)
-                    row_count += len(df)
-                    
-                    # Process each row
-                    for _, row in df.iterrows():
-                        try:
-                            country_code = row.get('country_code')
-                            # Skip if no country code
-                            if pd.isna(country_code):
-                                continue
-                            
-                            country_set.add(country_code)
-                                
-                            # Get crop information (from product or cpcv2_description)
-                            crop = row.get('product', '')
-                            if pd.isna(crop) or not crop:
-                                crop = row.get('cpcv2_description', 'Unknown Crop')
-                            if pd.isna(crop):
-                                crop = 'Unknown Crop'
-                            
-                            crop_set.add(crop)
-                            
-                            # Extract year information
-                            year = None
-                            if not pd.isna(row.get('season_year')):
-                                try:
-                                    year = int(row.get('season_year'))
-                                except:
-                                    # Try to extract year from dates
-                                    date_fields = ['start_date', 'period_date', 'harvest_end_date']
-                                    for field in date_fields:
-                                        if not pd.isna(row.get(field)):
-                                            try:
-                                                date_str = row.get(field)
-                                                # Try different date formats
-                                                for fmt in ['%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y', '%Y']:
-                                                    try:
-                                                        date_obj = datetime.strptime(date_str, fmt)
-                                                        year = date_obj.year
-                                                        break
-                                                    except:
-                                                        continue
-                                                if year:
-                                                    break
-                                            except:
-                                                continue
-                            
-                            # Extract seasonality information
-                            season = row.get('season_name', '')
-                            if pd.isna(season) or not season:
-                                season = row.get('season_type', 'Annual')
-                            if pd.isna(season):
-                                season = 'Annual'
-                            
-                            # Extract region information (most detailed available)
-                            region = None
-                            for admin_level in ['admin_4', 'admin_3', 'admin_2', 'admin_1', 'admin_0']:
-                                if not pd.isna(row.get(admin_level)) and row.get(admin_level):
-                                    region = row.get(admin_level)
-                                    break
-                            if not region:
-                                region = row.get('geographic_unit_name', 'National')
-                            
-                            # Extract indicator and determine data availability
-                            indicator = row.get('indicator', '')
-                            indicator_group = row.get('indicator_group', '')
-                            
-                            # Determine data metrics availability
-                            area_planted = False
-                            area_harvested = False
-                            quantity_produced = False
-                            production = False
-                            
-                            # Use indicator information to flag availability
-                            if not pd.isna(indicator):
-                                indicator_lower = indicator.lower()
-                                if 'planted' in indicator_lower or 'planting' in indicator_lower or 'area planted' in indicator_lower:
-                                    area_planted = True
-                                if 'harvested' in indicator_lower or 'harvesting' in indicator_lower or 'area harvested' in indicator_lower:
-                                    area_harvested = True
-                                if 'yield' in indicator_lower or 'production' in indicator_lower:
-                                    production = True
-                                if 'quantity' in indicator_lower or 'volume' in indicator_lower or 'output' in indicator_lower:
-                                    quantity_produced = True
-                            
-                            # Use indicator group as fallback
-                            if not (area_planted or area_harvested or quantity_produced or production) and not pd.isna(indicator_group):
-                                indicator_group_lower = indicator_group.lower()
-                                if 'area' in indicator_group_lower:
-                                    area_planted = True
-                                    area_harvested = True
-                                if 'production' in indicator_group_lower:
-                                    production = True
-                                if 'quantity' in indicator_group_lower or 'yield' in indicator_group_lower:
-                                    quantity_produced = True
-                            
-                            # Data source
-                            source = row.get('source_organization', '')
-                            if pd.isna(source) or not source:
-                                source = row.get('source_document', 'Unknown')
-                            if pd.isna(source):
-                                source = 'Unknown'
-                            
-                            # Update inventory
-                            if year:
-                                inventory[country_code][crop]['years'].add(year)
-                            
-                            inventory[country_code][crop]['seasonality'].add(season)
-                            inventory[country_code][crop]['area_planted'] |= area_planted
-                            inventory[country_code][crop]['area_harvested'] |= area_harvested
-                            inventory[country_code][crop]['quantity_produced'] |= quantity_produced
-                            inventory[country_code][crop]['production'] |= production
-                            
-                            if region:
-                                inventory[country_code][crop]['regions'].add(region)
-                            
-                            inventory[country_code][crop]['data_sources'].add(source)
-                            
-                            if not pd.isna(indicator):
-                                inventory[country_code][crop]['indicators'].add(indicator)
-                        except Exception as e:
-                            error_count += 1
-                            print(f"Error processing row: {e}")
-                    
-                    file_count += 1
-                    if file_count % 10 == 0:
-                        print(f"Processed {file_count} files, {row_count} rows with {error_count} errors")
-                        print(f"Found {len(country_set)} countries and {len(crop_set)} crops so far")
-                
-                except Exception as e:
-                    print(f"Error processing {os.path.join(dirpath, filename)}: {e}")
-    
-    # Convert sets to sorted lists for JSON serialization
-    for country_code in inventory:
-        for crop in inventory[country_code]:
-            inventory[country_code][crop]['years'] = sorted(list(inventory[country_code][crop]['years']))
-            inventory[country_code][crop]['seasonality'] = sorted(list(inventory[country_code][crop]['seasonality']))
-            inventory[country_code][crop]['regions'] = sorted(list(inventory[country_code][crop]['regions']))
-            inventory[country_code][crop]['data_sources'] = sorted(list(inventory[country_code][crop]['data_sources']))
-            inventory[country_code][crop]['indicators'] = sorted(list(inventory[country_code][crop]['indicators']))
+    # Walk through all directories to collect the crop data files
+    file_paths = list(_find_crop_files(root_directory))
+    
+    # Process the files in worker processes; map keeps the results in file order
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(_process_crop_file, file_paths, chunksize=4)
+        for file_path, (file_rows, bad_years, file_inventory, error) in zip(file_paths, results):
+            if verbose:
+                print(f"Processed {file_path}")
+            row_count += file_rows
+            error_count += bad_years
+            
+            # Merge the file's entries into the inventory
+            for key, info in file_inventory.items():
+                entry = inventory.get(key)
+                if entry is None:
+                    inventory[key] = info
+                else:
+                    entry.merge(info)
+                country_set.add(key[0])
+                crop_set.add(key[1])
+            
+            if error:
+                failed_files += 1
+                print(f"Error processing {file_path}: {error}")
+                continue
+            
+            file_count += 1
+            if file_count % 10 == 0:
+                print(f"Processed {file_count} files, {row_count} rows with {error_count} errors")
+                print(f"Found {len(country_set)} countries and {len(crop_set)} crops so far")
+    
+    # Reshape into the nested {country_code: {crop: entry}} structure, with the
+    # sets converted to sorted lists for JSON serialization
+    nested_inventory = {}
+    for (country_code, crop), entry in inventory.items():
+        nested_inventory.setdefault(country_code, {})[crop] = entry.to_json()
     
     # Print summary statistics
     print(f"Completed processing {file_count} files, {row_count} rows with {error_count} errors")
-    print(f"Final inventory contains {len(inventory)} countries and {sum(len(crops) for crops in inventory.values())} crop entries")
+    if failed_files:
+        print(f"Failed to process {failed_files} files")
+    print(f"Final inventory contains {len(nested_inventory)} countries and {len(inventory)} crop entries")
     
-    return dict(inventory)
+    return nested_inventory
 
 def create_summary_dataframe(inventory):
     """
     Create a summary dataframe from the inventory.
+    
+    The columns are built as whole arrays rather than one record per
+    country/crop combination.
     """
-    records = []
-    
-    for country_code, crops in inventory.items():
-        for crop_name, info in crops.items():
-            # Get a list of available indicators
-            indicators_available = []
-            if info['area_planted']:
-                indicators_available.append('Area Planted')
-            if info['area_harvested']:
-                indicators_available.append('Area Harvested')
-            if info['quantity_produced']:
-                indicators_available.append('Quantity Produced')
-            if info['production']:
-                indicators_available.append('Production')
-            
-            # Create a record for each country-crop combination
-            record = {
-                'country_code': country_code,
-                'crop': crop_name,
-                'year_count': len(info['years']),
-                'year_min': min(info['years']) if info['years'] else None,
-                'year_max': max(info['years']) if info['years'] else None,
-                'year_range': f"{min(info['years'])}-{max(info['years'])}" if info['years'] else "N/A",
-                'years': info['years'],  # Add the full list of years
-                'seasonality': ', '.join(info['seasonality']) if info['seasonality'] else "N/A",
-                'region_count': len(info['regions']),
-                'has_area_planted': info['area_planted'],
-                'has_area_harvested': info['area_harvested'],
-                'has_quantity': info['quantity_produced'],
-                'has_production': info['production'],
-                'indicators_available': ', '.join(indicators_available),
-                'completeness': sum([
-                    info['area_planted'], 
-                    info['area_harvested'], 
-                    info['quantity_produced'], 
-                    info['production']
-                ]) / 4.0 * 100,  # Keep this for filtering
-                'data_sources': '; '.join(info['data_sources']) if len(info['data_sources']) <= 3 else f"{len(info['data_sources'])} sources",
-                'indicator_count': len(info['indicators'])
-            }
-            records.append(record)
-    
-    return pd.DataFrame(records)
+    country_codes = [country_code for country_code, crops in inventory.items() for _ in crops]
+    crop_names = [crop_name for crops in inventory.values() for crop_name in crops]
+    infos = [info for crops in inventory.values() for info in crops.values()]
+    
+    # Year statistics; min/max stay missing for entries without years
+    years = [info['years'] for info in infos]
+    year_count = np.fromiter(map(len, years), dtype=np.int64, count=len(infos))
+    has_years = year_count > 0
+    year_min = pd.Series([min(entry_years) if entry_years else None for entry_years in years])
+    year_max = pd.Series([max(entry_years) if entry_years else None for entry_years in years])
+    year_range = np.full(len(infos), "N/A", dtype=object)
+    year_range[has_years] = (
+        year_min[has_years].astype(int).astype(str) + '-' + year_max[has_years].astype(int).astype(str)
+    ).to_numpy()
+    
+    # Availability flags as an (entries x 4) matrix, in FLAG_BITS order
+    flags = np.array([[info[name] for name in FLAG_BITS] for info in infos], dtype=bool).reshape(-1, len(FLAG_BITS))
+    
+    # Get a list of available indicators: one label per combination of flags
+    flag_labels = np.array([
+        ', '.join(name for name, bit in zip(INDICATOR_NAMES, FLAG_BITS.values()) if code & bit)
+        for code in range(1 << len(FLAG_BITS))
+    ], dtype=object)
+    indicators_available = flag_labels[flags @ np.array(list(FLAG_BITS.values()))]
+    
+    return pd.DataFrame({
+        'country_code': country_codes,
+        'crop': crop_names,
+        'year_count': year_count,
+        'year_min': year_min,
+        'year_max': year_max,
+        'year_range': year_range,
+        'years': years,  # Add the full list of years
+        'seasonality': [', '.join(info['seasonality']) if info['seasonality'] else "N/A" for info in infos],
+        'region_count': np.fromiter((len(info['regions']) for info in infos), dtype=np.int64, count=len(infos)),
+        'has_area_planted': flags[:, 0],
+        'has_area_harvested': flags[:, 1],
+        'has_quantity': flags[:, 2],
+        'has_production': flags[:, 3],
+        'indicators_available': indicators_available,
+        'completeness': flags.sum(axis=1) / 4.0 * 100,  # Keep this for filtering
+        'data_sources': [
+            '; '.join(info['data_sources']) if len(info['data_sources']) <= 3 else f"{len(info['data_sources'])} sources"
+            for info in infos
+        ],
+        'indicator_count': np.fromiter((len(info['indicators']) for info in infos), dtype=np.int64, count=len(infos))
+    })
 
-def load_country_mapping(mapping_file=None):
+def load_country_mapping(mapping_file=None, cache_dir=None):
     """
     Load country mapping from CSV file or use a fallback.
     
@@ -247,14 +482,60 @@ def load_country_mapping(mapping_file=None):
     -----------
     mapping_file : str, optional
         Path to the country codes CSV file
+    cache_dir : str, optional
+        Directory to keep a cached copy of the mapping in; it is reused while the
+        mapping file (and pycountry availability) are unchanged
     
     Returns:
     --------
-    dict
-        Mapping of country codes to country names
+    tuple of dict
+        Mapping of ISO2 country codes to ISO3 codes, and mapping of ISO3 codes
+        to country names
+    """
+    if not cache_dir:
+        return _build_country_mapping(mapping_file)
+    
+    # Key the cache on the mapping file version and whether pycountry can be imported
+    source_path = os.path.abspath(mapping_file) if mapping_file and os.path.exists(mapping_file) else None
+    cache_key = hashlib.sha1(str([
+        COUNTRY_MAPPING_CACHE_VERSION,
+        source_path,
+        os.path.getmtime(source_path) if source_path else None,
+        importlib.util.find_spec('pycountry') is not None
+    ]).encode()).hexdigest()
+    cache_path = os.path.join(cache_dir, "country_mapping.cache.json")
+    
+    try:
+        with open(cache_path, 'r') as f:
+            cached = json.load(f)
+        if cached.get('key') == cache_key:
+            print(f"Loaded cached country mapping from {cache_path}")
+            return cached['mapping'], cached['country_names']
+    except (OSError, ValueError):
+        pass
+    
+    mapping, country_names = _build_country_mapping(mapping_file)
+    
+    # Write the cache atomically so an interrupted run never leaves a partial file
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{cache_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'key': cache_key, 'mapping': mapping, 'country_names': country_names}, f)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"Warning: could not cache country mapping: {e}")
+    
+    return mapping, country_names
+
+def _build_country_mapping(mapping_file=None):
+    """
+    Build the ISO2 -> ISO3 and ISO3 -> name mappings from the CSV file,
+    pycountry and the fallback.
     """
-    # Start with an empty mapping
+    # Start with empty mappings
     mapping = {}
+    country_names = {}
     
     # Try to load from CSV if file is provided
     if mapping_file and os.path.exists(mapping_file):
@@ -264,18 +545,15 @@ def load_country_mapping(mapping_file=None):
             
             # Create ISO3 mapping
             if 'ISO2_Code' in df.columns and 'ISO3_Code' in df.columns:
-                for _, row in df.iterrows():
-                    if not pd.isna(row['ISO2_Code']) and not pd.isna(row['ISO3_Code']):
-                        mapping[row['ISO2_Code']] = row['ISO3_Code']
+                codes = df.dropna(subset=['ISO2_Code', 'ISO3_Code'])
+                mapping.update(zip(codes['ISO2_Code'].to_numpy(), codes['ISO3_Code'].to_numpy()))
                 
                 print(f"Created mapping for {len(mapping)} countries")
             
             # Also create a mapping from country codes to names
-            country_name_mapping = {}
             if 'ISO3_Code' in df.columns and 'Country_Name' in df.columns:
-                for _, row in df.iterrows():
-                    if not pd.isna(row['ISO3_Code']) and not pd.isna(row['Country_Name']):
-                        country_name_mapping[row['ISO3_Code']] = row['Country_Name']
+                names = df.dropna(subset=['ISO3_Code', 'Country_Name'])
+                country_names.update(zip(names['ISO3_Code'].to_numpy(), names['Country_Name'].to_numpy()))
         except Exception as e:
             print(f"Error processing country mapping file: {e}")
     
@@ -284,14 +562,16 @@ def load_country_mapping(mapping_file=None):
         import pycountry
         for country in pycountry.countries:
             if hasattr(country, 'alpha_3') and country.alpha_3:
-                if country.alpha_3 not in mapping:
-                    mapping[country.alpha_3] = country.name
+                if hasattr(country, 'alpha_2') and country.alpha_2 not in mapping:
+                    mapping[country.alpha_2] = country.alpha_3
+                if country.alpha_3 not in country_names:
+                    country_names[country.alpha_3] = country.name
     except ImportError:
         print("Warning: pycountry not available for additional country mappings")
     
-    # Add a fallback for common countries if the mapping is empty
-    if not mapping:
-        mapping = {
+    # Add a fallback for common countries if the names are empty
+    if not country_names:
+        country_names = {
             'USA': 'United States',
             'CAN': 'Canada',
             'MEX': 'Mexico',
@@ -306,4 +586,4 @@ def load_country_mapping(mapping_file=None):
         }
         print("Using fallback country mapping")
     
-    return mapping
\ No newline at end of file
+    return mapping, country_names
\ No newline at end of file
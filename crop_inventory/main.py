@@ -5,6 +5,12 @@ import pandas as pd
 import json
 from pathlib import Path
 
+# orjson is optional; it writes the inventory JSON much faster than the json module
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 def main():
     """Main function to run the crop data inventory process."""
     # Parse command-line arguments
@@ -14,6 +20,8 @@ def main():
     parser.add_argument('--country_mapping', type=str, help='Path to country codes CSV file')
     parser.add_argument('--port', type=int, default=8050, help='Port for the Dash server')
     parser.add_argument('--skip_processing', action='store_true', help='Skip data processing and use existing inventory files')
+    parser.add_argument('--pretty', action='store_true', help='Write the inventory JSON indented for reading')
+    parser.add_argument('--verbose', action='store_true', help='Print each data file as it is processed')
     
     args = parser.parse_args()
     
@@ -48,11 +56,16 @@ def main():
         # Create the inventory
         print(f"Creating crop inventory from {args.data_dir}...")
         try:
-            inventory = create_crop_inventory(args.data_dir)
+            inventory = create_crop_inventory(args.data_dir, verbose=args.verbose)
             
-            # Save to file
-            with open(inventory_path, 'w') as f:
-                json.dump(inventory, f, indent=2)
+            # Save to file (compact unless --pretty)
+            if orjson is not None:
+                with open(inventory_path, 'wb') as f:
+                    f.write(orjson.dumps(inventory, option=orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if args.pretty else 0)))
+            else:
+                # Same UTF-8 output as orjson
+                with open(inventory_path, 'w', encoding='utf-8') as f:
+                    json.dump(inventory, f, ensure_ascii=False, indent=2 if args.pretty else None, separators=None if args.pretty else (',', ':'))
             print(f"Inventory saved to {inventory_path}")
             
             # Create summary dataframe
@@ -72,9 +85,9 @@ def main():
             }).reset_index()
             
             # Get country names
-            country_mapping = load_country_mapping(args.country_mapping)
+            country_mapping, country_names = load_country_mapping(args.country_mapping, cache_dir=os.path.join(args.output_dir, '.cache'))
             country_summary['country_name'] = country_summary['country_code'].map(
-                lambda x: country_mapping.get(x, f"Country {x}")
+                lambda x: country_names.get(country_mapping.get(x, x), f"Country {x}")
             )
             
             country_summary.to_csv(country_summary_path, index=False)